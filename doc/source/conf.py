@@ -6,17 +6,12 @@
 # -- Project information -----------------------------------------------------
 # https://www.sphinx-doc.org/en/master/usage/configuration.html#project-information
 
-import os
-import sys
-
-sys.path.insert(0, os.path.abspath("../.."))
-
-from tomlparams import __version__
+from importlib.metadata import version
 
 project = 'TOMLParams'
 copyright = '2023, Smart Data Foundry Limited'
 author = 'Smart Data Foundry Limited'
-release = __version__
+release = version('tomlparams')
 
 extensions = [
     'myst_parser',
@@ -6,7 +6,7 @@ import sys
 from tomlparams import __version__
 from tomlparams.utils import error
 
-DIR = os.path.dirname(os.path.realpath(os.path.abspath(__file__)))
+DIR = os.path.dirname(os.path.abspath(__file__))
 EXAMPLES_DIR = os.path.join(DIR, 'examples')
 
 
@@ -27,29 +27,48 @@ Installation:
 '''
 
 
+def show_usage() -> None:
+    print(USAGE)
+
+
+def show_version() -> None:
+    print(__version__)
+
+
+def copy_examples() -> None:
+    dest_dir: str = os.path.abspath('.')
+    dest_path: str = os.path.join(dest_dir, 'tomlparams_examples')
+    shutil.copytree(
+        EXAMPLES_DIR,
+        dest_path,
+        ignore=shutil.ignore_patterns('__pycache__'),
+    )
+    print(f'Examples copied to {dest_path}.')
+
+
+DISPATCH = {
+    'help': show_usage,
+    '--help': show_usage,
+    '-h': show_usage,
+    'version': show_version,
+    '--version': show_version,
+    '-v': show_version,
+    'examples': copy_examples,
+}
+
+
 def main() -> None:
     args: list[str] = sys.argv
     if len(args) < 2:
-        print(USAGE)
-    else:
-        cmd = args[1].lower()
-        if cmd in ('help', '--help', '-h'):
-            print(USAGE)
-        elif cmd in ('version', '--version', '-v'):
-            print(__version__)
-        elif cmd == 'examples':
-            dest_dir: str = os.path.abspath('.')
-            dest_path: str = os.path.join(dest_dir, 'tomlparams_examples')
-            shutil.copytree(
-                EXAMPLES_DIR,
-                dest_path,
-                ignore=shutil.ignore_patterns('__pycache__'),
-            )
-            print(f'Examples copied to {dest_path}.')
-        else:
-            print(f'*** Unknown command: {" ".join(args)}\n')
-            print(USAGE, file=sys.stderr)
-            error(f'Unknown command: {cmd}')
+        show_usage()
+        return
+    cmd = args[1].lower()
+    handler = DISPATCH.get(cmd)
+    if handler is None:
+        print(f'*** Unknown command: {" ".join(args)}\n')
+        print(USAGE, file=sys.stderr)
+        error(f'Unknown command: {cmd}')
+    handler()
 
 
 if __name__ == '__main__':
@@ -9,62 +9,81 @@ from __future__ import annotations
 
 from typing import Any, ItemsView, KeysView, ValuesView
 
-from tomlparams.parse_helpers import to_saveable_object
-from tomlparams.utils import concatenate_keys
+from tomlparams.parse_helpers import to_saveable_object_from_group
 
 
 class ParamsGroup:
     """Container for parameters."""
 
+    # Bookkeeping lives in slots, so __dict__ holds the parameters and
+    # nothing else: the read paths below need no underscore filtering.
+    __slots__ = (
+        '__dict__',
+        '_depth',
+        '_param_indent',
+        '_group_indent',
+        '_sep',
+        '_header',
+        '_footer',
+        '_parent',
+    )
+
     def __init__(self, depth: int = 0, indent: int = 4) -> None:
         self._depth: int = depth
         self._param_indent: str = ' ' * indent * (depth + 1)
         self._group_indent: str = ' ' * indent * depth
+        # String-rendering scaffolding, fixed once the depth is known.
+        self._sep: str = f',\n{self._param_indent}'
+        self._header: str = f'ParamsGroup(\n{self._param_indent}'
+        self._footer: str = f'\n{self._group_indent})'
+        # The enclosing ParamsGroup (or, for the root group, the owning
+        # TOMLParams object), notified whenever a parameter changes so
+        # that views cached upstream can be dropped.
+        self._parent: Any = None
 
     def __str__(self) -> str:
-        body = f',\n{self._param_indent}'.join(
-            f'{k}: {str(v)}'
-            for (k, v) in self.__dict__.items()
-            if not k.startswith('_')
-        )
-        return (
-            f'ParamsGroup(\n{self._param_indent}{body}\n{self._group_indent})'
-        )
+        body = self._sep.join(f'{k}: {v}' for (k, v) in self.__dict__.items())
+        return f'{self._header}{body}{self._footer}'
 
     def __repr__(self) -> str:
-        body = f',\n{self._param_indent}'.join(
-            f'{k}={repr(v)}'
-            for (k, v) in self.__dict__.items()
-            if not k.startswith('_')
-        )
-        return (
-            f'ParamsGroup(\n{self._param_indent}{body}\n{self._group_indent})'
-        )
+        body = self._sep.join(f'{k}={v!r}' for (k, v) in self.__dict__.items())
+        return f'{self._header}{body}{self._footer}'
 
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, ParamsGroup):
             return NotImplemented
-        return set(concatenate_keys(self.as_saveable_object())) == set(
-            concatenate_keys(other.as_saveable_object())
-        )
+        return self.__dict__ == other.__dict__
 
     def __getitem__(self, item: str) -> Any:
         return self.__dict__[item]
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        # Anything outside __slots__ is a parameter; direct attribute
+        # assignment must invalidate upstream views just as __setitem__
+        # does.
+        if name not in ParamsGroup.__slots__:
+            self._invalidate_caches()
+
     def __setitem__(self, key: str, value: Any) -> None:
         self.__dict__[key] = value
+        self._invalidate_caches()
+
+    def _invalidate_caches(self) -> None:
+        """Tells the owner that a parameter changed, so any views cached
+        upstream (the flat key views on TOMLParams) can be dropped."""
+        if self._parent is not None:
+            self._parent._invalidate_caches()
 
     def get(self, key: str, default: Any | None = None) -> Any:
         return self.__dict__.get(key, default)
 
     def as_saveable_object(self) -> Any:
-        return to_saveable_object(self, self.as_dict())
+        return to_saveable_object_from_group(self)
 
     def get_params(self) -> dict[str, Any]:
         """Return a dictionary of parameters, excluding private attributes."""
-        return {
-            k: v for k, v in self.__dict__.items() if not k.startswith('_')
-        }
+        return dict(self.__dict__)
 
     def as_dict(self) -> dict[str, Any]:
         """Return a dictionary of parameters, including nested ParamsGroups.
@@ -74,7 +93,6 @@ class ParamsGroup:
         return {
             k: v.as_dict() if isinstance(v, ParamsGroup) else v
             for k, v in self.__dict__.items()
-            if not k.startswith('_')
         }
 
     def values(self) -> ValuesView[Any]:
@@ -92,18 +110,22 @@ def create_params_groups(
 ) -> ParamsGroup:
     params_group = ParamsGroup(depth)
     for k, v in input_dict.items():
-        if isinstance(v, dict):
-            params_group.__dict__[k] = create_params_groups(v, depth + 1)
+        if type(v) is dict:
+            child = create_params_groups(v, depth + 1)
+            child._parent = params_group
+            params_group[k] = child
         elif is_iterable_of_dicts(v):
-            params_group.__dict__[k] = [
-                create_params_groups(x, depth + 1) for x in v
-            ]
+            children = [create_params_groups(x, depth + 1) for x in v]
+            for child in children:
+                child._parent = params_group
+            params_group[k] = children
         else:
-            params_group.__dict__[k] = v
+            params_group[k] = v
     return params_group
 
 
 def is_iterable_of_dicts(item: Any) -> bool:
-    if isinstance(item, (set, list, tuple)):
-        return all(isinstance(x, dict) for x in item)
-    return False
+    t = type(item)
+    if t is not list and t is not tuple and t is not set:
+        return False
+    return all(type(x) is dict for x in item)
@@ -7,14 +7,16 @@ from __future__ import annotations
 
 import datetime
 import os
-import re
 from enum import Enum, auto
+from functools import cached_property
 from typing import Any
 
 from tomlparams import params_group
 from tomlparams.utils import error
 
-USER_RESERVED_NAMES_RE: re.Pattern[str] = re.compile(r'^(u|user)[-_].*$')
+# Names reserved for user TOML files; equivalent to the regular
+# expression ^(u|user)[-_].*$ (see is_user_reserved_path).
+USER_RESERVED_PREFIXES: tuple[str, ...] = ('u-', 'u_', 'user-', 'user_')
 DEFAULT_PARAMS_NAME: str = 'tomlparams'
 DEFAULT_PARAMS_TYPE_CHECKING_NAME = 'TOMLPARAMSCHECKING'
 DEFAULTS_ONLY_NAMES: list[str] = ['default', 'defaults']
@@ -43,24 +45,26 @@ class ParseMismatch:
         self.pm_type = pm_type
         self.position = position
         self.key = key
-        if default_type:
-            if isinstance(default_type, list):
-                self.default_type = (
-                    '['
-                    + ','.join(sorted([d.__name__ for d in default_type]))
-                    + ']'
-                )
-            else:
-                self.default_type = default_type.__name__
-        if toml_type:
-            if isinstance(toml_type, list):
-                self.toml_type = (
-                    '['
-                    + ','.join(sorted([t.__name__ for t in toml_type]))
-                    + ']'
-                )
-            else:
-                self.toml_type = toml_type.__name__
+        # Raw types are kept as passed; the readable forms below are
+        # only built if a mismatch is actually reported.
+        self._default_type = default_type
+        self._toml_type = toml_type
+
+    @staticmethod
+    def _format_type(t: type | list[type] | None) -> str | None:
+        if t is None:
+            return None
+        if isinstance(t, list):
+            return '[' + ','.join(sorted(x.__name__ for x in t)) + ']'
+        return t.__name__
+
+    @cached_property
+    def default_type(self) -> str | None:
+        return self._format_type(self._default_type)
+
+    @cached_property
+    def toml_type(self) -> str | None:
+        return self._format_type(self._toml_type)
 
     def __str__(self) -> str:
         hierarchy = (
@@ -108,61 +112,110 @@ def to_saveable_object(
     Returns:
         TOML-dumpable object
     """
-    if isinstance(o, dict):
-        return {
-            k: to_saveable_object(v, ref[k], include_iterables)
-            for k, v in o.items()
-            if ref and k in ref
-        }
-    elif isinstance(o, params_group.ParamsGroup):
-        return {
-            k: to_saveable_object(v, ref[k], include_iterables)
-            for k, v in o.__dict__.items()
-            if ref and k in ref
-        }
-    elif isinstance(o, (list, tuple)):
-        if ref:
-            new_v: list[Any] = []
-            for item in o:
-                if isinstance(item, dict):
-                    new_v.append(
-                        to_saveable_object(item, item, include_iterables)
-                    )
-                elif isinstance(item, params_group.ParamsGroup):
-                    new_v.append(
-                        to_saveable_object(
-                            item, item.as_dict(), include_iterables
-                        )
+    # Explicit worklist rather than recursion, so that deeply nested
+    # parameter trees cannot hit the interpreter recursion limit. Each
+    # entry carries the container slot (parent, key) its converted
+    # value should be written into; dict children are pushed in reverse
+    # so that LIFO popping preserves key order in the result.
+    root: list[Any] = [None]
+    stack: list[tuple[Any, Any, Any, Any]] = [(root, 0, o, ref)]
+    while stack:
+        parent, key, obj, obj_ref = stack.pop()
+        if type(obj) is dict:
+            new_d: dict[str, Any] = {}
+            parent[key] = new_d
+            if obj is obj_ref:
+                # A dict is its own reference (as for table-array
+                # items), so every key passes: skip the membership
+                # tests and lookups.
+                for k, v in reversed(obj.items()):
+                    stack.append((new_d, k, v, v))
+            elif obj_ref:
+                for k, v in reversed(obj.items()):
+                    if k in obj_ref:
+                        stack.append((new_d, k, v, obj_ref[k]))
+        elif isinstance(obj, params_group.ParamsGroup):
+            new_d = {}
+            parent[key] = new_d
+            if obj_ref:
+                for k, v in reversed(obj.__dict__.items()):
+                    if k in obj_ref:
+                        stack.append((new_d, k, v, obj_ref[k]))
+        elif isinstance(obj, (list, tuple)):
+            if obj_ref:
+                new_v: list[Any] = [None] * len(obj)
+                parent[key] = new_v
+                for i, item in enumerate(obj):
+                    if type(item) is dict:
+                        stack.append((new_v, i, item, item))
+                    elif isinstance(item, params_group.ParamsGroup):
+                        stack.append((new_v, i, item, item.as_dict()))
+                    else:
+                        new_v[i] = item
+            elif include_iterables:
+                new_v = [None] * len(obj)
+                parent[key] = new_v
+                for i, item in enumerate(obj):
+                    stack.append((new_v, i, item, None))
+            else:
+                parent[key] = obj
+        elif obj is None or type(obj) in (
+            bool,
+            str,
+            int,
+            float,
+            datetime.date,
+            datetime.time,
+            datetime.datetime,
+        ):
+            parent[key] = obj
+        elif isinstance(obj, Enum):
+            parent[key] = obj.value
+        elif callable(obj):
+            parent[key] = obj.__name__
+        elif hasattr(obj, 'as_saveable_object'):
+            parent[key] = obj.as_saveable_object()
+        else:
+            raise ValueError(
+                f'Cannot flatten object type {type(obj)}:\n{str(obj)}'
+            )
+    return root[0]
+
+
+def to_saveable_object_from_group(group: Any) -> dict[str, Any]:
+    """Convert a ParamsGroup to a TOML-dumpable dict in a single pass.
+
+    Equivalent to to_saveable_object(group, group.as_dict()), but since
+    a group is always a superset of its own dict view there is nothing
+    to filter, so the intermediate as_dict materialisation and the
+    per-key ref lookups are skipped.
+
+    Args:
+        group: ParamsGroup to be flattened
+
+    Returns:
+        TOML-dumpable dict
+    """
+    d: dict[str, Any] = {}
+    for k, v in group.__dict__.items():
+        if type(v) is params_group.ParamsGroup:
+            d[k] = to_saveable_object_from_group(v)
+        elif isinstance(v, (list, tuple)):
+            d[k] = [
+                (
+                    to_saveable_object_from_group(item)
+                    if isinstance(item, params_group.ParamsGroup)
+                    else (
+                        to_saveable_object(item, item)
+                        if type(item) is dict
+                        else item
                     )
-                else:
-                    new_v.append(item)
-            return new_v
-        return (
-            [
-                to_saveable_object(v, include_iterables=include_iterables)
-                for v in o
+                )
+                for item in v
             ]
-            if include_iterables
-            else o
-        )
-    elif o is None or type(o) in (
-        bool,
-        str,
-        int,
-        float,
-        datetime.date,
-        datetime.time,
-        datetime.datetime,
-    ):
-        return o
-    elif isinstance(o, Enum):
-        return o.value
-    elif callable(o):
-        return o.__name__
-    elif hasattr(o, 'as_saveable_object'):
-        return o.as_saveable_object()
-    else:
-        raise ValueError(f'Cannot flatten object type {type(o)}:\n{str(o)}')
+        else:
+            d[k] = to_saveable_object(v, v)
+    return d
 
 
 def selectively_update_dict(
@@ -176,88 +229,139 @@ def selectively_update_dict(
         d: dictionary with string keys
         new_d: dictionary with string keys
     """
-    for k, v in new_dict.items():
-        if isinstance(v, dict) and k in original_dict:
-            if isinstance(original_dict[k], dict):
-                selectively_update_dict(original_dict[k], v)
-            else:
-                original_dict[k] = v
-        else:
-            original_dict[k] = v
+    stack = [(original_dict, new_dict)]
+    while stack:
+        original, new = stack.pop()
+        get = original.get
+        for k, v in new.items():
+            if type(v) is dict:
+                existing = get(k)
+                if type(existing) is dict:
+                    stack.append((existing, v))
+                    continue
+            original[k] = v
 
 
 def is_user_reserved_path(path: str) -> bool:
     name = os.path.basename(path)
-    return bool(re.match(USER_RESERVED_NAMES_RE, name))
+    return name.startswith(USER_RESERVED_PREFIXES)
 
 
 def get_collection_types(coll: list[Any] | set[Any] | tuple[Any]) -> set[type]:
-    return {type(item) for item in coll}
+    # Collections are nearly always homogeneous, so compare against the
+    # first element's type by identity and only grow the set on a
+    # genuinely new type.
+    it = iter(coll)
+    for item in it:
+        first = type(item)
+        break
+    else:
+        return set()
+    types = {first}
+    for item in it:
+        t = type(item)
+        if t is not first:
+            types.add(t)
+    return types
+
+
+def _copy_defaults(defaults: dict[str, Any]) -> dict[str, Any]:
+    """Rebuilds the dict shells of a defaults tree, aliasing the leaf
+    values, exactly as the consolidation walk does when there is
+    nothing to overwrite."""
+    return {
+        k: _copy_defaults(v) if type(v) is dict else v
+        for k, v in defaults.items()
+    }
 
 
 def overwrite_defaults_with_toml(
     hierarchy: list[str],
     defaults: dict[str, Any],
     overwrite: dict[str, Any] | None = None,
+    type_check: bool = True,
 ) -> tuple[dict[str, Any], list[ParseMismatch]]:
-    if overwrite is None:
-        overwrite = {}
-
-    ret_d = {}
-    parse_mismatches = []
-
-    for default_key, default_value in defaults.items():
-        if isinstance(default_value, dict):
-            ov = overwrite.get(default_key)
-            if ov is not None and not isinstance(ov, dict):
-                raise KeyError(
-                    f'*** ERROR: {default_key} should be a section of the toml'
-                    ' file'
+    if not overwrite:
+        # Nothing to merge and nothing to mismatch: every value is its
+        # own default, so skip the walk and the type checks entirely.
+        return _copy_defaults(defaults), []
+
+    ret_d: dict[str, Any] = {}
+    parse_mismatches: list[ParseMismatch] = []
+
+    # Explicit worklist rather than recursion: one entry per (sub)section,
+    # carrying the result dict being filled in at that level.
+    stack: list[
+        tuple[dict[str, Any], dict[str, Any], list[str], dict[str, Any]]
+    ] = [(defaults, overwrite or {}, hierarchy, ret_d)]
+
+    while stack:
+        level_defaults, level_overwrite, level_hierarchy, level_ret = (
+            stack.pop()
+        )
+        for default_key, default_value in level_defaults.items():
+            if type(default_value) is dict:
+                ov = level_overwrite.get(default_key)
+                if ov is not None and type(ov) is not dict:
+                    raise KeyError(
+                        f'*** ERROR: {default_key} should be a section of'
+                        ' the toml file'
+                    )
+                new_dict: dict[str, Any] = {}
+                level_ret[default_key] = new_dict
+                stack.append(
+                    (
+                        default_value,
+                        ov or {},
+                        level_hierarchy + [default_key],
+                        new_dict,
+                    )
                 )
-            new_dict, new_type_mismatches = overwrite_defaults_with_toml(
-                hierarchy + [default_key],
-                defaults=default_value,
-                overwrite=ov,
-            )
-            ret_d[default_key] = new_dict
-            parse_mismatches.extend(new_type_mismatches)
-        else:
-            ov = overwrite.get(default_key, default_value)
+            else:
+                ov = level_overwrite.get(default_key, default_value)
+                level_ret[default_key] = ov
+                if not type_check:
+                    continue
+                default_type = type(default_value)
+                toml_type = type(ov)
+
+                if default_type in (list, set, tuple):
+                    default_types = get_collection_types(default_value)
+                    toml_types = get_collection_types(ov)
+                    if default_types - toml_types:
+                        parse_mismatches.append(
+                            ParseMismatch(
+                                ParseMismatchType.TYPING,
+                                level_hierarchy,
+                                default_key,
+                                list(default_types),
+                                list(toml_types),
+                            )
+                        )
 
-            if isinstance(default_value, (set, list, tuple)):
-                default_types = get_collection_types(default_value)
-                toml_types = get_collection_types(ov)
-                if default_types - toml_types:
+                if toml_type is not default_type:
                     parse_mismatches.append(
                         ParseMismatch(
                             ParseMismatchType.TYPING,
-                            hierarchy,
+                            level_hierarchy,
                             default_key,
-                            list(default_types),
-                            list(toml_types),
+                            default_type,
+                            toml_type,
                         )
                     )
 
-            if type(ov) != type(default_value):  # noqa
-                parse_mismatches.append(
+        if level_overwrite and (
+            bad_keys := level_overwrite.keys()
+            - level_defaults.keys()
+            - {'include'}
+        ):
+            parse_mismatches.extend(
+                [
                     ParseMismatch(
-                        ParseMismatchType.TYPING,
-                        hierarchy,
-                        default_key,
-                        type(default_value),
-                        type(ov),
+                        ParseMismatchType.BADKEY, level_hierarchy, key
                     )
-                )
-            ret_d[default_key] = ov
-
-    if overwrite is not None and (
-        bad_keys := set(overwrite.keys()) - set(defaults.keys()) - {'include'}
-    ):
-        parse_mismatches.extend(
-            [
-                ParseMismatch(ParseMismatchType.BADKEY, hierarchy, key)
-                for key in bad_keys
-            ]
-        )
+                    for key in bad_keys
+                ]
+            )
 
     return ret_d, parse_mismatches
@@ -5,6 +5,7 @@ Copyright (c) Stochastic Solutions Limited 2016-2023
 MIT Licensed.
 """
 
+import io
 import sys
 
 
@@ -22,20 +23,16 @@ class CaptureOutput(object):
     """
 
     def __init__(self, echo: bool = False, stream: str = "stdout") -> None:
-        self.stream = stream
-        if stream == "stdout":
-            self.saved = sys.stdout
-            sys.stdout = self
-        elif stream == "stderr":
-            self.saved = sys.stderr
-            sys.stderr = self
-        else:
+        if stream not in ("stdout", "stderr"):
             raise Exception("Unsupported capture stream %s" % stream)
-        self.out: list[str] = []
+        self.stream = stream
+        self.saved = getattr(sys, stream)
+        setattr(sys, stream, self)
+        self.out = io.StringIO()
         self.echo: bool = echo
 
     def write(self, s: str) -> None:
-        self.out.append(s)
+        self.out.write(s)
         if self.echo:
             self.saved.write(s)
 
@@ -43,14 +40,11 @@ class CaptureOutput(object):
         if self.echo:
             self.saved.flush()
 
-    def getvalue(self) -> None:
-        self.saved.flush()
+    def getvalue(self) -> str:
+        return self.out.getvalue()
 
     def restore(self) -> None:
-        if self.stream == "stdout":
-            sys.stdout = self.saved
-        else:
-            sys.stderr = self.saved
+        setattr(sys, self.stream, self.saved)
 
     def __str__(self) -> str:
-        return "".join(self.out)
+        return self.out.getvalue()
@@ -2,118 +2,266 @@ from __future__ import annotations
 
 import datetime
 import os
+import shutil
+import sys
 import tempfile
 import unittest
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping
+from unittest import mock
 
-import tomli
 from parameterized import parameterized
 
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
 from tomlparams import TOMLParams
 from tomlparams.params_group import ParamsGroup
-from tomlparams.tests.captureoutput import CaptureOutput
 from tomlparams.utils import TOMLParamsError, concatenate_keys
 
 THISDIR = os.path.dirname(os.path.abspath(__file__))
 XDIR = os.path.join(THISDIR, 'testdata')
 EXPECTEDDIR = os.path.join(THISDIR, 'testdata', 'expected')
+STDDIR = os.path.join(XDIR, 'tomlparams')
+USERDIR = os.path.join(XDIR, 'usertomlparams')
+
+# Reference files for the consolidated-TOML tests, built once rather
+# than joined at each call site.
+EXPECTED = {
+    name: os.path.join(EXPECTEDDIR, f'{name}.toml')
+    for name in (
+        'unchanged',
+        'two',
+        'three',
+        'self',
+        'deep',
+        'user_only',
+        'one',
+    )
+}
 
 
-class TestTOMLParams(unittest.TestCase):
-    def setUp(self) -> None:
-        self.co = CaptureOutput(stream='stderr')
+@lru_cache(maxsize=None)
+def read_ref(refpath: str) -> bytes:
+    """Reads (and caches) a reference TOML file; the expected files are
+    static test data, so each is read from disk at most once per run."""
+    with open(refpath, 'rb') as f:
+        return f.read()
 
-    def tearDown(self) -> None:
-        self.co.restore()
 
-    def assertFileCorrect(self, path: str | Path, refpath: str | Path) -> None:
-        with open(path) as f:
-            orig = f.read()
-        with open(refpath) as f:
-            ref = f.read()
-        self.assertEqual(orig, ref)
+def freeze(d: dict[str, Any]) -> Mapping[str, Any]:
+    """Makes a read-only (recursively proxied) view of a defaults dict,
+    so shared templates cannot be mutated by a test by accident."""
+    return MappingProxyType(
+        {k: freeze(v) if isinstance(v, dict) else v for k, v in d.items()}
+    )
+
+
+def thaw(d: Mapping[str, Any]) -> dict[str, Any]:
+    """Makes a fresh, mutable copy of a frozen defaults template."""
+    return {k: thaw(v) if isinstance(v, Mapping) else v for k, v in d.items()}
+
+
+# Read-only defaults templates shared (via thaw) by the tests below.
+STD_DEFAULTS: Mapping[str, Any] = freeze(
+    {
+        'n': 1,
+        'f': 1.5,
+        's': 'tomlparams',
+        'd': datetime.datetime(2000, 1, 1, 12, 34, 56),
+        'b': True,
+        'subsection': {
+            'n': 0,
+            'pi': 3.14159265,
+        },
+        'section2': {
+            'is_subsec': True,
+            'n': 2,
+        },
+    }
+)
+ENV_DEFAULTS: Mapping[str, Any] = freeze(
+    {
+        's': 'none',
+        'subsection': {'n': 0},
+        'section2': {'n': 0},
+    }
+)
+DEEP_DEFAULTS: Mapping[str, Any] = freeze(
+    {
+        "not_there_1": 2,
+        "z": 4,
+        "this": {
+            "was": {
+                "pretty": {
+                    "deep": {"folks": {"x": 1, "y": 3, "not_there_2": 9}}
+                }
+            }
+        },
+    }
+)
+
+# Type-checking scenarios: (label, defaults template, params name)
+# for WARN-mode warnings, plus the checking mode for the raising cases
+# (bad keys raise even in WARN mode).
+TYPE_CHECK_WARNING_CASES: list[tuple[str, Mapping[str, Any], str]] = [
+    (
+        'root_level',
+        freeze({"not_there_1": 2, "z": 4}),
+        'type_check_root_level',
+    ),
+    (
+        'shallow',
+        freeze({"s": "one", "section": {"subsection": {"n": "one"}}}),
+        'type_check_shallow',
+    ),
+    ('list', freeze({"s": ["one", 2]}), 'type_check_list'),
+    ('deep_level', DEEP_DEFAULTS, 'type_check_deeper_level'),
+    (
+        'dates',
+        freeze({"not_there_1": 2, "date": '1970-01-01'}),
+        'type_check_dates',
+    ),
+]
+TYPE_CHECK_ERROR_CASES: list[tuple[str, Mapping[str, Any], str, Any]] = [
+    (
+        'root_level',
+        freeze({"not_there_1": 2, "z": 4}),
+        'type_check_root_level',
+        TOMLParams.ERROR,
+    ),
+    (
+        'shallow',
+        freeze({"s": "one", "section": {"subsection": {"n": "one"}}}),
+        'type_check_shallow',
+        TOMLParams.ERROR,
+    ),
+    (
+        'bad_key_shallow',
+        freeze({"s": 1, "section": {"subsection": {"m": "two"}}}),
+        'type_check_shallow',
+        TOMLParams.ERROR,
+    ),
+    (
+        'type_and_bad_key_shallow',
+        freeze({"s": "one", "section": {"subsection": {"m": "two"}}}),
+        'type_check_shallow',
+        TOMLParams.ERROR,
+    ),
+    (
+        'warn_bad_key_shallow',
+        freeze({"s": "one", "section": {"subsection": {"m": "two"}}}),
+        'type_check_shallow',
+        TOMLParams.WARN,
+    ),
+]
+
+# Case tables for the data-driven tests below.
+TABLE_ARRAY_CASES: list[tuple[str, int]] = [
+    ('same_length', 2),
+    ('longer', 3),
+    ('shorter', 1),
+]
+SET_ITEM_CASES: list[tuple[str, Any]] = [
+    ("a", 2),  # present in defaults
+    ("b", 3),  # not present, but top level key currently works
+    # (should it?)
+    ("nested.a", 4),  # nested key
+]
+
+
+class TestTOMLParams(unittest.TestCase):
+    _tmp: tempfile.TemporaryDirectory[str]
+    outdir: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.outdir = cls._tmp.name
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._tmp.cleanup()
+
+    def outpath(self) -> str:
+        return os.path.join(self.outdir, f'{self._testMethodName}.toml')
+
+    def assertFileCorrect(
+        self, path: str | Path, refpath: str | Path
+    ) -> dict[str, Any]:
+        """Checks that the file at path matches the reference file at
+        refpath, and returns its parsed content, so that callers needing
+        both the byte-for-byte check and the parsed parameters read the
+        file only once."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        ref = read_ref(str(refpath))
+        if data != ref:
+            # Decode only on failure, purely for a readable diff.
+            self.assertEqual(data.decode(), ref.decode())
+        return tomllib.loads(data.decode())
 
     def test_write_consolidated_toml_unchanged_from_defaults(self) -> None:
         # Tests writing of consolidated TOML file when
         # uk_retirees.toml exists but is empty, so what's written
         # is in fact the defaults.
-        defaults = {
-            'n': 1,
-            'f': 1.5,
-            's': 'tomlparams',
-            'd': datetime.datetime(2000, 1, 1, 12, 34, 56),
-            'b': True,
-            'subsection': {
-                'n': 0,
-                'pi': 3.14159265,
-            },
-            'section2': {
-                'is_subsec': True,
-                'n': 2,
-            },
-        }
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        outdir = tempfile.mkdtemp()
-        consolidated_path = os.path.join(outdir, 'in_params.toml')
+        defaults = thaw(STD_DEFAULTS)
+        consolidated_path = self.outpath()
 
         params = TOMLParams(
             defaults,
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
             verbose=False,
         )
         params.write_consolidated_toml(consolidated_path, verbose=False)
-        self.assertFileCorrect(
-            consolidated_path, os.path.join(EXPECTEDDIR, 'unchanged.toml')
+        loaded_params = self.assertFileCorrect(
+            consolidated_path, EXPECTED['unchanged']
         )
-        with open(consolidated_path, 'rb') as f:
-            loaded_params = tomli.load(f)
         self.assertEqual(loaded_params, defaults)
 
+    def test_to_toml_string(self) -> None:
+        # The string form must match what write_consolidated_toml
+        # writes to disk.
+        consolidated_path = self.outpath()
+        params = TOMLParams(
+            thaw(STD_DEFAULTS),
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
+            verbose=False,
+        )
+        params.write_consolidated_toml(consolidated_path, verbose=False)
+        with open(consolidated_path, 'rb') as f:
+            written = f.read()
+        self.assertEqual(params.to_toml_string(), written.decode('utf-8'))
+
     def test_write_consolidated_toml_with_hierarchy(self) -> None:
         # Tests writing of consolidated TOML file when
         # one.toml and two.toml both exist.
         # two.toml includes one.toml and they have some conflicts
-        defaults: dict[str, Any] = {
-            'n': 1,
-            'f': 1.5,
-            's': 'tomlparams',
-            'd': datetime.datetime(2000, 1, 1, 12, 34, 56),
-            'b': True,
-            'subsection': {
-                'n': 0,
-                'pi': 3.14159265,
-            },
-            'section2': {
-                'is_subsec': True,
-                'n': 2,
-            },
-        }
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        outdir = tempfile.mkdtemp()
-        consolidated_path = os.path.join(outdir, 'in_params.toml')
+        defaults = thaw(STD_DEFAULTS)
+        consolidated_path = self.outpath()
 
         params = TOMLParams(
             defaults=defaults,
             name='two',
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
             verbose=False,
         )
         params.write_consolidated_toml(consolidated_path, verbose=False)
-        self.assertFileCorrect(
-            consolidated_path, os.path.join(EXPECTEDDIR, 'two.toml')
+        loaded_params = self.assertFileCorrect(
+            consolidated_path, EXPECTED['two']
         )
 
-        expected = defaults  # Same object, but being updated
+        expected = thaw(STD_DEFAULTS)
         expected['s'] = 'two'
         expected['subsection']['n'] = 2
         expected['section2']['n'] = 1
-        with open(consolidated_path, 'rb') as f:
-            loaded_params = tomli.load(f)
         self.assertEqual(loaded_params, expected)
 
     def test_write_consolidated_toml_list_hierarchy(self) -> None:
@@ -121,504 +269,239 @@ class TestTOMLParams(unittest.TestCase):
         # three.toml, four.toml and five.toml all exist.
         # three.toml includes four.toml and five.toml in order
         # with some conflicts
-        defaults: dict[str, Any] = {
-            'n': 1,
-            'f': 1.5,
-            's': 'tomlparams',
-            'd': datetime.datetime(2000, 1, 1, 12, 34, 56),
-            'b': True,
-            'subsection': {
-                'n': 0,
-                'pi': 3.14159265,
-            },
-            'section2': {
-                'is_subsec': True,
-                'n': 2,
-            },
-        }
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        outdir = tempfile.mkdtemp()
-        consolidated_path = os.path.join(outdir, 'in_params.toml')
+        defaults = thaw(STD_DEFAULTS)
+        consolidated_path = self.outpath()
 
         params = TOMLParams(
             defaults,
             name='three',
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
             verbose=False,
         )
         params.write_consolidated_toml(consolidated_path, verbose=False)
-        self.assertFileCorrect(
-            consolidated_path, os.path.join(EXPECTEDDIR, 'three.toml')
+        loaded_params = self.assertFileCorrect(
+            consolidated_path, EXPECTED['three']
         )
 
-        expected = defaults  # Same object, but being updated
+        expected = thaw(STD_DEFAULTS)
         expected['s'] = 'three'
         expected['subsection']['n'] = 5
         expected['section2']['n'] = 4
-        with open(consolidated_path, 'rb') as f:
-            loaded_params = tomli.load(f)
         self.assertEqual(loaded_params, expected)
 
     def test_self_inclusion(self) -> None:
-        defaults: dict[str, Any] = {
-            'n': 1,
-            'f': 1.5,
-            's': 'tomlparams',
-            'd': datetime.datetime(2000, 1, 1, 12, 34, 56),
-            'b': True,
-            'subsection': {
-                'n': 0,
-                'pi': 3.14159265,
-            },
-            'section2': {
-                'is_subsec': True,
-                'n': 2,
-            },
-        }
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        outdir = tempfile.mkdtemp()
-        consolidated_path = os.path.join(outdir, 'in_params.toml')
+        defaults = thaw(STD_DEFAULTS)
+        consolidated_path = self.outpath()
 
         params = TOMLParams(
             defaults,
             name='self',
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
             verbose=False,
         )
         params.write_consolidated_toml(consolidated_path, verbose=False)
-        self.assertFileCorrect(
-            consolidated_path, os.path.join(EXPECTEDDIR, 'self.toml')
+        loaded_params = self.assertFileCorrect(
+            consolidated_path, EXPECTED['self']
         )
 
-        expected = defaults  # Same object, but being updated
+        expected = thaw(STD_DEFAULTS)
         expected['s'] = 'self'
         expected['subsection']['n'] = 1
         expected['section2']['n'] = 1
-        with open(consolidated_path, 'rb') as f:
-            loaded_params = tomli.load(f)
         self.assertEqual(loaded_params, expected)
 
     def test_write_consolidated_toml_deep_equals(self) -> None:
-        defaults: dict[str, Any] = {
-            "not_there_1": 2,
-            "z": 4,
-            "this": {
-                "was": {
-                    "pretty": {
-                        "deep": {"folks": {"x": 1, "y": 3, "not_there_2": 9}}
-                    }
-                }
-            },
-        }
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        outdir = tempfile.mkdtemp()
-        consolidated_path = os.path.join(outdir, 'in_params.toml')
+        defaults = thaw(DEEP_DEFAULTS)
+        consolidated_path = self.outpath()
 
         params = TOMLParams(
             defaults,
             name='deep',
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
             verbose=False,
         )
 
         params.write_consolidated_toml(consolidated_path, verbose=False)
-        self.assertFileCorrect(
-            consolidated_path, os.path.join(EXPECTEDDIR, 'deep.toml')
+        loaded_params = self.assertFileCorrect(
+            consolidated_path, EXPECTED['deep']
         )
 
-        expected = defaults  # Same object, but being updated
+        expected = thaw(DEEP_DEFAULTS)
         expected['z'] = 3
         expected['this']['was']['pretty']['deep']['folks']['x'] = 2
         expected['this']['was']['pretty']['deep']['folks']['y'] = 5
-        with open(consolidated_path, 'rb') as f:
-            loaded_params = tomli.load(f)
         self.assertEqual(loaded_params, expected)
 
     def test_userparams_not_in_stdparams(self) -> None:
         defaults: dict[str, Any] = {'x': 10}
-        stddir: str = os.path.join(XDIR, 'tomlparams')
-        userdir: str = os.path.join(XDIR, 'usertomlparams')
-        outdir: str = tempfile.mkdtemp()
-        consolidated_path: str = os.path.join(outdir, 'in_params.toml')
+        consolidated_path = self.outpath()
 
         params = TOMLParams(
             defaults,
             name='user_only',
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
             verbose=False,
         )
 
         params.write_consolidated_toml(consolidated_path, verbose=False)
-        self.assertFileCorrect(
-            consolidated_path, os.path.join(EXPECTEDDIR, 'user_only.toml')
+        loaded_params = self.assertFileCorrect(
+            consolidated_path, EXPECTED['user_only']
         )
 
-        expected = defaults  # Same object, but being updated
-        expected['x'] = 4
-        with open(consolidated_path, 'rb') as f:
-            loaded_params = tomli.load(f)
+        expected = {'x': 4}
         self.assertEqual(loaded_params, expected)
 
+    def naughty_std_dir(self, reserved_name: str) -> str:
+        """Copies the standard params dir into this test's own corner of
+        the class temp dir and drops a reserved-name TOML file into the
+        copy, so tests never write into the shared testdata tree."""
+        std_dir = os.path.join(self.outdir, self._testMethodName)
+        shutil.copytree(STDDIR, std_dir)
+        Path(os.path.join(std_dir, f'{reserved_name}.toml')).touch()
+        return std_dir
+
     def test_reserved_user_raises(self) -> None:
         defaults: dict[str, Any] = {'x': 10}
-        stddir: str = os.path.join(XDIR, 'tomlparams')
-        userdir: str = os.path.join(XDIR, 'usertomlparams')
-        naughty_toml: str = os.path.join(XDIR, 'tomlparams', 'user_only.toml')
-        open(naughty_toml, "wt").close()
+        std_dir = self.naughty_std_dir('user_only')
 
         def create_params() -> None:
             TOMLParams(
                 defaults,
                 name='user_only',
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
+                standard_params_dir=std_dir,
+                user_params_dir=USERDIR,
                 verbose=False,
             )
 
-        try:
-            self.assertRaises(ValueError, create_params)
-            with self.assertRaises(ValueError) as cm:
-                create_params()
-                expected_error = (
-                    '*** ERROR: path'
-                    f' {THISDIR}/testdata/tomlparams/user_only.toml is'
-                    ' reserved for user TOML files, but exists in'
-                    ' standardparams.\n'
-                )
-                self.assertEqual(str(cm.exception), expected_error)
-        finally:
-            os.remove(naughty_toml)
+        with self.assertRaises(ValueError) as cm:
+            create_params()
+        expected_error = (
+            f'path {std_dir}/user_only.toml is reserved for user'
+            ' TOML files, but exists in standardparams.'
+        )
+        self.assertEqual(str(cm.exception), expected_error)
 
     def test_reserved_u_raises(self) -> None:
         defaults = {'x': 10}
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        naughty_toml = os.path.join(XDIR, 'tomlparams', 'u_only.toml')
-        open(naughty_toml, "wt").close()
+        std_dir = self.naughty_std_dir('u_only')
 
         def create_params() -> None:
             TOMLParams(
                 defaults,
                 name='u_only',
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
+                standard_params_dir=std_dir,
+                user_params_dir=USERDIR,
                 verbose=False,
             )
 
-        try:
-            self.assertRaises(ValueError, create_params)
-            with self.assertRaises(ValueError) as cm:
-                create_params()
-                expected_error = (
-                    '*** ERROR: path'
-                    f' {THISDIR}/testdata/tomlparams/u_only.toml is reserved'
-                    ' for user TOML files, but exists in standardparams.\n'
-                )
-                self.assertEqual(str(cm.exception), expected_error)
-        finally:
-            os.remove(naughty_toml)
+        with self.assertRaises(ValueError) as cm:
+            create_params()
+        expected_error = (
+            f'path {std_dir}/u_only.toml is reserved for user'
+            ' TOML files, but exists in standardparams.'
+        )
+        self.assertEqual(str(cm.exception), expected_error)
 
     def test_default_env_param_used_no_name(self) -> None:
-        stddir: str = os.path.join(XDIR, 'tomlparams')
-        userdir: str = os.path.join(XDIR, 'usertomlparams')
-        outdir: str = tempfile.mkdtemp()
-        consolidated_path: str = os.path.join(outdir, 'in_params.toml')
-        defaults: dict[str, Any] = {
-            's': 'none',
-            'subsection': {'n': 0},
-            'section2': {'n': 0},
-        }
-
-        self.assertIsNone(os.environ.get('TOMLPARAMS'))
-        os.environ['TOMLPARAMS'] = 'one'
+        consolidated_path = self.outpath()
+        defaults = thaw(ENV_DEFAULTS)
 
-        params = TOMLParams(
-            defaults,
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
-            verbose=False,
-        )
+        with mock.patch.dict(os.environ, {'TOMLPARAMS': 'one'}):
+            params = TOMLParams(
+                defaults,
+                standard_params_dir=STDDIR,
+                user_params_dir=USERDIR,
+                verbose=False,
+            )
 
         params.write_consolidated_toml(consolidated_path, verbose=False)
-        self.assertFileCorrect(
-            consolidated_path, os.path.join(EXPECTEDDIR, 'one.toml')
+        loaded_params = self.assertFileCorrect(
+            consolidated_path, EXPECTED['one']
         )
 
-        expected = defaults
+        expected = thaw(ENV_DEFAULTS)
         expected['s'] = 'one'
         expected['subsection']['n'] = 1
         expected['section2']['n'] = 1
-        with open(consolidated_path, 'rb') as f:
-            loaded_params = tomli.load(f)
         self.assertEqual(loaded_params, expected)
 
-        os.environ.pop('TOMLPARAMS', None)
-
     def test_defined_env_param_used_no_name(self) -> None:
-        stddir: str = os.path.join(XDIR, 'tomlparams')
-        userdir: str = os.path.join(XDIR, 'usertomlparams')
-        outdir: str = tempfile.mkdtemp()
-        consolidated_path: str = os.path.join(outdir, 'in_params.toml')
-        defaults: dict[str, Any] = {
-            's': 'none',
-            'subsection': {'n': 0},
-            'section2': {'n': 0},
-        }
-
-        self.assertIsNone(os.environ.get('MYTOMLPARAMS'))
-        os.environ['MYTOMLPARAMS'] = 'one'
+        consolidated_path = self.outpath()
+        defaults = thaw(ENV_DEFAULTS)
 
-        params = TOMLParams(
-            defaults,
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
-            env_var='MYTOMLPARAMS',
-            verbose=False,
-        )
+        with mock.patch.dict(os.environ, {'MYTOMLPARAMS': 'one'}):
+            params = TOMLParams(
+                defaults,
+                standard_params_dir=STDDIR,
+                user_params_dir=USERDIR,
+                env_var='MYTOMLPARAMS',
+                verbose=False,
+            )
 
         params.write_consolidated_toml(consolidated_path, verbose=False)
-        self.assertFileCorrect(
-            consolidated_path, os.path.join(EXPECTEDDIR, 'one.toml')
+        loaded_params = self.assertFileCorrect(
+            consolidated_path, EXPECTED['one']
         )
 
-        expected = defaults
+        expected = thaw(ENV_DEFAULTS)
         expected['s'] = 'one'
         expected['subsection']['n'] = 1
         expected['section2']['n'] = 1
-        with open(consolidated_path, 'rb') as f:
-            loaded_params = tomli.load(f)
         self.assertEqual(loaded_params, expected)
 
-        os.environ.pop('MYTOMLPARAMS', None)
-
-    def test_type_checking_root_level_warning(self) -> None:
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        defaults = {"not_there_1": 2, "z": 4}
-        with self.assertWarns(Warning):
-            TOMLParams(
-                defaults,
-                name='type_check_root_level',
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
-                verbose=False,
-                check_types=TOMLParams.WARN,
-            )
-
-    def test_type_checking_shallow_warning(self) -> None:
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        defaults = {"s": "one", "section": {"subsection": {"n": "one"}}}
-        with self.assertWarns(Warning):
-            TOMLParams(
-                defaults,
-                name='type_check_shallow',
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
-                verbose=False,
-                check_types=TOMLParams.WARN,
-            )
-
-    def test_type_checking_list(self) -> None:
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        defaults = {"s": ["one", 2]}
-        with self.assertWarns(Warning):
-            TOMLParams(
-                defaults,
-                name='type_check_list',
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
-                verbose=False,
-                check_types=TOMLParams.WARN,
-            )
-
-    def test_type_checking_deep_level_warning(self) -> None:
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        defaults = {
-            "not_there_1": 2,
-            "z": 4,
-            "this": {
-                "was": {
-                    "pretty": {
-                        "deep": {"folks": {"x": 1, "y": 3, "not_there_2": 9}}
-                    }
-                }
-            },
-        }
-        with self.assertWarns(Warning):
-            TOMLParams(
-                defaults,
-                name='type_check_deeper_level',
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
-                verbose=False,
-                check_types=TOMLParams.WARN,
-            )
-
-    def test_date_type_checking_warning(self) -> None:
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        defaults = {
-            "not_there_1": 2,
-            "date": '1970-01-01',
-        }
-        with self.assertWarns(Warning):
+    @parameterized.expand(TYPE_CHECK_WARNING_CASES)  # type: ignore [misc]
+    def test_type_checking_warning(
+        self, _label: str, defaults: Mapping[str, Any], name: str
+    ) -> None:
+        with self.assertWarnsRegex(Warning, 'Type mismatch'):
             TOMLParams(
-                defaults,
-                name='type_check_dates',
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
+                thaw(defaults),
+                name=name,
+                standard_params_dir=STDDIR,
+                user_params_dir=USERDIR,
                 verbose=False,
                 check_types=TOMLParams.WARN,
             )
 
-    def test_type_checking_root_level_error(self) -> None:
-        stddir: str = os.path.join(XDIR, 'tomlparams')
-        userdir: str = os.path.join(XDIR, 'usertomlparams')
-        defaults: dict[str, Any] = {"not_there_1": 2, "z": 4}
-
-        def create_params() -> None:
-            TOMLParams(
-                defaults,
-                name='type_check_root_level',
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
-                verbose=False,
-                check_types=TOMLParams.ERROR,
-            )
-
-        self.assertRaises(
-            TOMLParamsError,
-            create_params,
-        )
-
-    def test_type_checking_shallow_error(self) -> None:
-        stddir: str = os.path.join(XDIR, 'tomlparams')
-        userdir: str = os.path.join(XDIR, 'usertomlparams')
-        defaults: dict[str, Any] = {
-            "s": "one",
-            "section": {"subsection": {"n": "one"}},
-        }
-
-        def create_params() -> None:
-            TOMLParams(
-                defaults,
-                name='type_check_shallow',
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
-                verbose=False,
-                check_types=TOMLParams.ERROR,
-            )
-
-        self.assertRaises(
-            TOMLParamsError,
-            create_params,
-        )
-
-    def test_bad_key_shallow_error(self) -> None:
-        stddir: str = os.path.join(XDIR, 'tomlparams')
-        userdir: str = os.path.join(XDIR, 'usertomlparams')
-        defaults: dict[str, Any] = {
-            "s": 1,
-            "section": {"subsection": {"m": "two"}},
-        }
-
-        def create_params() -> None:
-            TOMLParams(
-                defaults,
-                name='type_check_shallow',
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
-                verbose=False,
-                check_types=TOMLParams.ERROR,
-            )
-
-        self.assertRaises(
-            TOMLParamsError,
-            create_params,
-        )
-
-    def test_type_checking_bad_key_shallow_error(self) -> None:
-        stddir: str = os.path.join(XDIR, 'tomlparams')
-        userdir: str = os.path.join(XDIR, 'usertomlparams')
-        defaults: dict[str, Any] = {
-            "s": "one",
-            "section": {"subsection": {"m": "two"}},
-        }
-
-        def create_params() -> None:
-            TOMLParams(
-                defaults,
-                name='type_check_shallow',
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
-                verbose=False,
-                check_types=TOMLParams.ERROR,
-            )
-
-        self.assertRaises(
-            TOMLParamsError,
-            create_params,
-        )
-
-    def test_type_checking_warn_bad_key_shallow_error(self) -> None:
-        stddir: str = os.path.join(XDIR, 'tomlparams')
-        userdir: str = os.path.join(XDIR, 'usertomlparams')
-        defaults: dict[str, Any] = {
-            "s": "one",
-            "section": {"subsection": {"m": "two"}},
-        }
-
-        def create_params() -> None:
+    @parameterized.expand(TYPE_CHECK_ERROR_CASES)  # type: ignore [misc]
+    def test_type_checking_error(
+        self,
+        _label: str,
+        defaults: Mapping[str, Any],
+        name: str,
+        check_types: Any,
+    ) -> None:
+        with self.assertRaises(TOMLParamsError):
             TOMLParams(
-                defaults,
-                name='type_check_shallow',
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
+                thaw(defaults),
+                name=name,
+                standard_params_dir=STDDIR,
+                user_params_dir=USERDIR,
                 verbose=False,
-                check_types=TOMLParams.WARN,
+                check_types=check_types,
             )
 
-        self.assertRaises(
-            TOMLParamsError,
-            create_params,
-        )
-
     def test_type_check_env_var_fail(self) -> None:
-        stddir: str = os.path.join(XDIR, 'tomlparams')
-        userdir: str = os.path.join(XDIR, 'usertomlparams')
-        defaults: dict[str, Any] = {
-            's': 'none',
-            'subsection': {'n': 0},
-            'section2': {'n': 0},
-        }
-
-        self.assertIsNone(os.environ.get('TOMLPARAMSCHECKING'))
-        os.environ['TOMLPARAMSCHECKING'] = 'pp'
+        defaults = thaw(ENV_DEFAULTS)
 
         def create_params() -> None:
             TOMLParams(
                 defaults,
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
+                standard_params_dir=STDDIR,
+                user_params_dir=USERDIR,
                 env_var='MYTOMLPARAMS',
                 verbose=False,
             )
 
-        self.assertRaises(
-            TOMLParamsError,
-            create_params,
-        )
-        os.environ.pop('TOMLPARAMSCHECKING', None)
+        with mock.patch.dict(os.environ, {'TOMLPARAMSCHECKING': 'pp'}):
+            self.assertRaises(
+                TOMLParamsError,
+                create_params,
+            )
 
     def test_concatenate_keys(self) -> None:
         d = {'a': {'b': 1, 'c': 2}, 'd': 3}
@@ -626,159 +509,157 @@ class TestTOMLParams(unittest.TestCase):
         self.assertEqual(tuple(concatenate_keys(d)), expected)
 
     def test_read_defaults_as_directory(self) -> None:
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        defaults_as_dir = os.path.join(stddir, 'defaults_as_dir')
-        defaults_as_file = os.path.join(stddir, 'defaults_as_file')
+        defaults_as_dir = os.path.join(STDDIR, 'defaults_as_dir')
+        defaults_as_file = os.path.join(STDDIR, 'defaults_as_file')
         params_default_as_dir = TOMLParams(
             defaults_as_dir,
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
             verbose=False,
         )
         params_default_as_file = TOMLParams(
             defaults_as_file,
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
             verbose=False,
         )
         self.assertEqual(params_default_as_dir, params_default_as_file)
 
-    @parameterized.expand(['human', 'animals', 'fungi'])  # type: ignore [misc]
-    def test_content_defaults_as_directory(
-        self, default_primary_key: str
-    ) -> None:
-        # primary keys of default as file
-        # primary_keys = ['human', 'animals', 'fungi']
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-        defaults_as_dir = os.path.join(stddir, 'defaults_as_dir')
-        defaults_as_file = os.path.join(stddir, 'defaults_as_file')
+    def test_content_defaults_as_directory(self) -> None:
+        defaults_as_dir = os.path.join(STDDIR, 'defaults_as_dir')
+        defaults_as_file = os.path.join(STDDIR, 'defaults_as_file')
         params_default_as_dir = TOMLParams(
             defaults_as_dir,
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
             verbose=False,
         )
         params_default_as_file = TOMLParams(
             defaults_as_file,
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
             verbose=False,
         )
-        d_as_dir = set(
-            concatenate_keys(
-                params_default_as_dir[default_primary_key].as_dict()
-            )
-        )
-        d_as_file = set(
-            concatenate_keys(
-                params_default_as_file[default_primary_key].as_dict()
-            )
-        )
-        self.assertEqual(d_as_dir, d_as_file)
+        # primary keys of default as file
+        for default_primary_key in ('human', 'animals', 'fungi'):
+            with self.subTest(default_primary_key=default_primary_key):
+                d_as_dir = set(
+                    concatenate_keys(
+                        params_default_as_dir[default_primary_key].as_dict()
+                    )
+                )
+                d_as_file = set(
+                    concatenate_keys(
+                        params_default_as_file[default_primary_key].as_dict()
+                    )
+                )
+                self.assertEqual(d_as_dir, d_as_file)
 
     def test_read_defaults_as_directory_repeated_keys(self) -> None:
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
         defaults_as_dir_repeated_keys = os.path.join(
-            stddir, 'defaults_as_dir_repeated_keys'
+            STDDIR, 'defaults_as_dir_repeated_keys'
         )
         self.assertRaises(
             KeyError,
             lambda: TOMLParams(
                 defaults_as_dir_repeated_keys,
-                standard_params_dir=stddir,
-                user_params_dir=userdir,
+                standard_params_dir=STDDIR,
+                user_params_dir=USERDIR,
                 verbose=False,
             ),
         )
 
     def test_table_array(self) -> None:
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
 
         params = TOMLParams(
             "table_array_defaults",
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
             verbose=False,
         )
 
         for array in params['array']:
             self.assertIsInstance(array, ParamsGroup)
 
-    def test_table_array_overwriting_same_length(self) -> None:
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-
-        params = TOMLParams(
-            defaults="table_array_defaults",
-            name="table_array_same_length",
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
-            verbose=False,
-        )
-
-        self.assertEqual(len(params['array']), 2)
-
-    def test_table_array_overwriting_longer(self) -> None:
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
-
+    @parameterized.expand(TABLE_ARRAY_CASES)  # type: ignore [misc]
+    def test_table_array_overwriting(
+        self, suffix: str, expected_length: int
+    ) -> None:
         params = TOMLParams(
             defaults="table_array_defaults",
-            name="table_array_longer",
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            name=f"table_array_{suffix}",
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
             verbose=False,
         )
 
-        self.assertEqual(len(params['array']), 3)
+        self.assertEqual(len(params['array']), expected_length)
 
-    def test_table_array_overwriting_shorter(self) -> None:
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
+    def test_set_item(self) -> None:
+        for key, value in SET_ITEM_CASES:
+            with self.subTest(key=key, value=value):
+                defaults: dict[str, Any] = {
+                    'a': 1,
+                    "nested": {
+                        "a": 1,
+                        "b": 2,
+                    },
+                }
 
-        params = TOMLParams(
-            defaults="table_array_defaults",
-            name="table_array_shorter",
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
-            verbose=False,
-        )
+                params = TOMLParams(
+                    defaults=defaults,
+                    name='base',
+                    standard_params_dir=STDDIR,
+                    user_params_dir=USERDIR,
+                )
+                params[key] = value
+                assert params[key] == value
 
-        self.assertEqual(len(params['array']), 1)
-
-    @parameterized.expand(  # type: ignore [misc]
-        [
-            ["a", 2],  # present in defaults
-            [
-                "b",
-                3,  # not present, but top level key currently works (should it?)
-            ],
-            ["nested.a", 4],  # nested key
-        ]
-    )
-    def test_set_item(self, key: str, value: Any) -> None:
+    def test_dotted_read_reflects_mutations(self) -> None:
+        """Regression test for the flat (dotted-key) views: after a
+        dotted read has been served, a mutation through any path must be
+        visible to the next dotted read."""
         defaults: dict[str, Any] = {
-            'a': 1,
+            's': 'original',
+            'xs': [1, 2, 3],
             "nested": {
                 "a": 1,
                 "b": 2,
             },
         }
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
 
         params = TOMLParams(
             defaults=defaults,
             name='base',
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
+            verbose=False,
         )
-        params[key] = value
-        assert params[key] == value
+        # Prime both views before mutating.
+        self.assertEqual(params['nested.a'], 1)
+        self.assertEqual(params['xs.0'], 1)
+
+        # Setting an item on a nested group.
+        params['nested']['a'] = 10
+        self.assertEqual(params['nested.a'], 10)
+
+        # Setting an attribute on a nested group.
+        group = params['nested']
+        group.b = 20
+        self.assertEqual(params['nested.b'], 20)
+
+        # Setting a dotted key on the params object.
+        params['nested.a'] = 30
+        self.assertEqual(params['nested.a'], 30)
+
+        # Setting a top-level attribute on the params object.
+        params.s = 'changed'
+        self.assertEqual(params.get_concatenated_key('s'), 'changed')
+
+        # Mutating a list-valued parameter in place, which no hook can
+        # observe.
+        params['xs'][0] = 99
+        self.assertEqual(params['xs.0'], 99)
 
     def test_set_item_raises(self) -> None:
         """Trying to set a nested key that doesn't exist should raise a
@@ -786,14 +667,12 @@ class TestTOMLParams(unittest.TestCase):
         defaults: dict[str, Any] = {
             'a': 1,
         }
-        stddir = os.path.join(XDIR, 'tomlparams')
-        userdir = os.path.join(XDIR, 'usertomlparams')
 
         params = TOMLParams(
             defaults=defaults,
             name='base',
-            standard_params_dir=stddir,
-            user_params_dir=userdir,
+            standard_params_dir=STDDIR,
+            user_params_dir=USERDIR,
         )
 
         with self.assertRaises(KeyError):
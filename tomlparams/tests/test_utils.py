@@ -1,19 +1,17 @@
 import unittest
 
-from parameterized import parameterized
-
 from tomlparams.utils import warn
 
 
 class TestUtils(unittest.TestCase):
 
-    @parameterized.expand(
-        [
+    def test_warn(self) -> None:
+        cases: tuple[tuple[str, ...], ...] = (
             ("This is a warning",),
             ("This", "is", "a", "warning"),
             ("This is a warning", "and this is another warning"),
-        ]
-    )  # type: ignore [misc]
-    def test_warn(self, *msg: str) -> None:
-        with self.assertWarns(UserWarning):
-            warn(*msg)
+        )
+        for msg in cases:
+            with self.subTest(msg=msg):
+                with self.assertWarns(UserWarning):
+                    warn(*msg)
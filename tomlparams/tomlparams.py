@@ -30,6 +30,7 @@ from tomlparams.utils import (
 )
 
 SPECIAL_KEYS = ['include', 'exclude_keys']
+ISSUES_HEADER = 'The following issues were found:\n'
 LOGGER = logging.getLogger(__name__)
 
 
@@ -161,16 +162,47 @@ class TOMLParams:
             env_var_checking_value, check_types
         )
 
+        # Cached flat (dotted-key) view of the parameters, built lazily
+        # by the property below and dropped on any mutation.
+        self._concatenated_keys_cache: dict[str, Any] | None = None
+
         self.set_params(name, report_load=self._verbose)
 
     @property
     def _concatenated_keys(self) -> dict[str, Any]:
-        return dict(concatenate_keys(self.as_dict()))
+        if self._concatenated_keys_cache is None:
+            self._concatenated_keys_cache = dict(
+                concatenate_keys(self.as_dict())
+            )
+        return self._concatenated_keys_cache
 
     @property
     def _concatenated_keys_with_list(self) -> dict[str, Any]:
+        # Never cached: this view indexes into list-valued parameters,
+        # and lists can be mutated in place (p.xs[0] = 99) without any
+        # hook firing, so it is rebuilt on every access. The dict-only
+        # view above is safe to cache because dict leaves always become
+        # parented ParamsGroups, whose mutations are tracked.
         return dict(concatenate_keys_with_list(self.as_saveable_object()))
 
+    def _invalidate_concatenated_keys(self) -> None:
+        """Drops the cached flat view; called whenever parameters
+        change."""
+        self._concatenated_keys_cache = None
+
+    def _invalidate_caches(self) -> None:
+        """Called by a ParamsGroup (via its parent chain) when one of
+        its parameters changes, so the flat view stays in step with
+        mutations made below the top level."""
+        self._invalidate_concatenated_keys()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        # Non-underscore attributes are parameters; assigning one must
+        # drop the flat view just as __setitem__ does.
+        if not name.startswith('_'):
+            self._invalidate_concatenated_keys()
+
     def __getitem__(self, item: str) -> Any:
         try:
             return self.__dict__[item]
@@ -194,6 +226,7 @@ class TOMLParams:
         return self._concatenated_keys_with_list[key]
 
     def __setitem__(self, key: str, value: Any) -> None:
+        self._invalidate_concatenated_keys()
         splitted_key: list[int | str] = [
             int(k) if k.isdigit() else k for k in key.split(".")
         ]
@@ -261,9 +294,8 @@ class TOMLParams:
             report_load: print loading status
         """
         self._toml_files_used: list[str] = []
-        env_params = os.environ.get(self._env_var, self._base_params_stem)
         if name is None:
-            name = env_params
+            name = os.environ.get(self._env_var, self._base_params_stem)
         self._name = name  # of the run/in_params/results subdir etc.
 
         self.load(report=report_load)
@@ -434,41 +466,42 @@ class TOMLParams:
             hierarchy=[],
             defaults=self._defaults,
             overwrite=toml,
+            type_check=self._check_types is not TOMLParams.OFF,
         )
 
         if mismatches:
             error_messages = []
-            type_mismatch_strings = [
-                str(m)
-                for m in mismatches
-                if m.pm_type is ParseMismatchType.TYPING
-            ]
-            bad_key_strings = [
-                str(m)
-                for m in mismatches
-                if m.pm_type is ParseMismatchType.BADKEY
-            ]
+            type_mismatch_strings: list[str] = []
+            bad_key_strings: list[str] = []
+            for m in mismatches:
+                if m.pm_type is ParseMismatchType.TYPING:
+                    type_mismatch_strings.append(str(m))
+                elif m.pm_type is ParseMismatchType.BADKEY:
+                    bad_key_strings.append(str(m))
 
             if type_mismatch_strings and self._check_types is TOMLParams.WARN:
-                warning_messages = ['The following issues were found:\n']
+                warning_messages = [ISSUES_HEADER]
                 warning_messages.extend(type_mismatch_strings)
                 warn(*warning_messages)
             elif (
                 type_mismatch_strings and self._check_types is TOMLParams.ERROR
             ):
-                error_messages.append('The following issues were found:\n')
+                error_messages.append(ISSUES_HEADER)
                 error_messages.extend(type_mismatch_strings)
             if bad_key_strings:
                 if not error_messages:
-                    error_messages.append('The following issues were found:\n')
+                    error_messages.append(ISSUES_HEADER)
                 error_messages.extend(bad_key_strings)
 
             if error_messages:
                 error(*error_messages)
 
-        self.__dict__.update(
-            create_params_groups(consolidated_dict).get_params()
-        )
+        root_group = create_params_groups(consolidated_dict)
+        # Parent the root group to this object so that mutations made
+        # through nested groups invalidate the flat views too.
+        root_group._parent = self
+        self.__dict__.update(root_group.get_params())
+        self._invalidate_concatenated_keys()
 
     def toml_files_str(self) -> str:
         return ', '.join(self._toml_files_used) or ''
@@ -497,11 +530,17 @@ class TOMLParams:
     def as_dict(self) -> Any:
         return to_saveable_object(self.__dict__, self._defaults, False)
 
+    def to_toml_string(self) -> str:
+        """Returns the consolidated parameters as a TOML-formatted
+        string, identical to the content write_consolidated_toml would
+        write to disk."""
+        return tomli_w.dumps(self.as_saveable_object())
+
     def write_consolidated_toml(
         self, path: str, verbose: bool | None = None
     ) -> None:
         verbose = verbose or self._verbose
-        d = to_saveable_object(self.__dict__, self._defaults)
+        d = self.as_saveable_object()
         with open(path, 'wb') as f:
             tomli_w.dump(d, f)
         if verbose:
@@ -5,10 +5,17 @@ Utils
 
 from __future__ import annotations
 
+import copy
+import os
+import sys
 import warnings
+from functools import lru_cache
 from typing import Any, Generator, NoReturn, TypeVar
 
-import tomli
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
 
 
 class TOMLParamsError(Exception):
@@ -41,10 +48,24 @@ def nvl(value: U | None, default: V) -> U | V:
 
 
 def load_toml(path: str) -> dict[str, Any]:
-    """Protected TOML load using tomli that reports what the file was if
-    parsing fails (and then re-raises the exception)."""
+    """Protected TOML load using tomllib (tomli on Python < 3.11) that
+    reports what the file was if parsing fails (and then re-raises the
+    exception)."""
+    st = os.stat(path)
+    parsed = _load_toml_cached(path, st.st_mtime_ns, st.st_size)
+    return copy.deepcopy(parsed)
+
+
+@lru_cache(maxsize=256)
+def _load_toml_cached(path: str, mtime_ns: int, size: int) -> dict[str, Any]:
+    """Parses the TOML file at path, caching the result.
+
+    The file's mtime and size are part of the cache key, so editing a
+    file invalidates its entry automatically. Callers get the cached
+    tree itself; use load_toml to get a mutation-safe copy.
+    """
     with open(path, 'rb') as f:
-        return tomli.load(f)
+        return tomllib.load(f)
 
 
 def concatenate_keys(